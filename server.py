@@ -1,17 +1,97 @@
 import os
+import asyncio
 import socket
+import stat
 import threading
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import lru_cache
 from urllib.parse import unquote
-from datetime import datetime
 import argparse
 import time
+import logging
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+RECV_SIZE = 8192
+MAX_REQUEST_SIZE = 1 << 16
+LISTEN_BACKLOG = 1024
+# Largest body slice the async server must push within one timeout period
+SENDFILE_SLICE = 1 << 20
+# How often an idle keep-alive connection checks whether its worker is wanted elsewhere
+IDLE_POLL = 0.5
+
+SERVER_HEADER = b"Server: Python HTTP Server\r\n"
+KEEP_ALIVE_HEADER = b"Connection: keep-alive\r\n"
+CLOSE_HEADER = b"Connection: close\r\n"
+DEFAULT_CONTENT_TYPE = b"application/octet-stream"
+
+RESPONSE_CODES = ("200 OK", "400 BadRequest", "403 Forbidden", "404 FileNotFound", "501 NotImplemented")
+STATUS_LINES = {
+    (version, code): version.encode('ascii') + b" " + code.encode('ascii') + b"\r\n"
+    for version in ("HTTP/1.0", "HTTP/1.1")
+    for code in RESPONSE_CODES
+}
+
+SUPPORTED_EXTS = frozenset({'.pdf', '.jpeg', '.jpg', '.png', '.txt', '.gif', '.html', '.mp4',
+                            '.json', '', '.js', '.css'})
+
+mimetypes.init()
+
+# Content-type per supported extension, looked up once instead of via mimetypes.guess_type
+MIME = {
+    file_type: mimetypes.types_map[file_type].encode('ascii')
+    for file_type in SUPPORTED_EXTS if file_type in mimetypes.types_map
+}
+
+
+def build_header_template(file_type):
+    return SERVER_HEADER + b"Content-type: " + MIME.get(file_type, DEFAULT_CONTENT_TYPE) + b"\r\n"
+
+
+# Everything but the status line, date, length and connection, per supported extension
+HEADER_TEMPLATES = {file_type: build_header_template(file_type) for file_type in SUPPORTED_EXTS}
+
+
+# Returned by get_file_path for requests that resolve outside the document root
+FORBIDDEN_PATH = object()
+
+
+@lru_cache(maxsize=None)
+def resolve_root(document_root):
+    # join adds the trailing separator without doubling it for a root of '/'
+    return os.path.join(os.path.realpath(document_root), '')
+
+
+@lru_cache(maxsize=1024)
+def resolve_path(root_abs, file_name):
+    # realpath follows symlinks too, so a link pointing out of the root is caught here.
+    # Results are cached, though: a symlink retargeted outside the root after its first
+    # request keeps resolving to the old target until evicted or the server restarts.
+    file_path = os.path.realpath(os.path.join(root_abs, file_name.lstrip('/')))
+    if not file_path.startswith(root_abs):
+        return None
+    return file_path
 
-import os
 
-def get_file_type(filepath):
-    _, file_extension = os.path.splitext(filepath)
-    return file_extension.lower()
+def advise_sequential(fd):
+    # Ask for aggressive read-ahead; whole-file sends are always sequential
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+class PoolBacklog:
+    """Counts connections submitted to a worker pool that no worker has picked up yet."""
+
+    def __init__(self):
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def add(self, count):
+        with self._lock:
+            self.waiting += count
 
 
 class HttpServer:
@@ -20,101 +100,239 @@ class HttpServer:
     FORBIDDEN = "error/403.html"
     FILE_NOT_FOUND = "error/404.html"
     METHOD_NOT_SUPPORTED = "error/501.html"
-
-    connected_clients = set()
-
-    def __init__(self, connect, document_root, protocol, debug = False, timeout=10):
+    SUPPORTED_EXTS = SUPPORTED_EXTS
+    SEND_BUFFER_SIZE = 1 << 20
+    # Total across all listeners. Idle connections give their worker back as soon as another
+    # connection is waiting (see wait_idle), so the pool only needs to cover active transfers.
+    MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    # Smallest pool a listener gets; fewer listeners are opened rather than starving each one
+    MIN_POOL_WORKERS = 8
+
+    # (epoch second, formatted Date header value)
+    _date_cache = (0, b"")
+    _date_lock = threading.Lock()
+
+    def __init__(self, connect, document_root, protocol, debug = False, timeout=10, backlog=None):
         self.connect = connect
+        self.backlog = backlog
         self.document_root = document_root
+        self._root_abs = resolve_root(document_root)
         self.protocol = protocol
         self.timeout = timeout
         self.debug = debug
 
         if connect:
-            client_ip = connect.getpeername()[0]
-            if client_ip not in self.connected_clients:
-                self.connected_clients.add(client_ip)
-                print(f"Connection opened: {client_ip}")
+            log.debug("Connection opened: %s", connect.getpeername()[0])
 
     def start(self, port, timeout = 500):
+        # With SO_REUSEPORT the kernel spreads new connections over one listener per core;
+        # otherwise a single listener and accept loop take everything.
+        listeners = 1
+        if hasattr(socket, "SO_REUSEPORT"):
+            listeners = max(1, min(os.cpu_count() or 1, self.MAX_WORKERS // self.MIN_POOL_WORKERS))
+        workers = max(1, self.MAX_WORKERS // listeners)
+        server_sockets = []
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-                server_socket.settimeout(timeout)
-                server_socket.bind(('localhost', port))
-                server_socket.listen(3)
-                print(f"Server started.\nListening for connections on port: {port}\n")
-                count = 0
-
-                while True:
-                    count += 1
-                    client_socket, client_address = server_socket.accept()
-                    server = HttpServer(client_socket, self.document_root, self.protocol, self.debug)
-                    thread = threading.Thread(target=server.run, name = f"Thread-{count}")
-                    thread.start()
-                    # multi threading in python: GIL is a mechanism that allows one thread 
-                    # to execute python bytecode at a time in a single process. 
+            if listeners > 1:
+                # Bind once without SO_REUSEPORT first so that a port already in use fails with
+                # EADDRINUSE instead of silently sharing connections with another server
+                self.open_listener(port, timeout, reuse_port=False).close()
+            for _ in range(listeners):
+                server_sockets.append(self.open_listener(port, timeout, reuse_port=listeners > 1))
+            log.info("Server started. Listening for connections on port: %s", port)
+
+            acceptors = [
+                threading.Thread(target=self.accept_loop, args=(server_socket, workers),
+                                 name=f"Acceptor-{index}", daemon=True)
+                for index, server_socket in enumerate(server_sockets)
+            ]
+            for acceptor in acceptors:
+                acceptor.start()
+            for acceptor in acceptors:
+                acceptor.join()
         except Exception as e:
-            print(f"Socket connection timed out: {e}")
+            log.error("Server error: %s", e)
         finally:
-            server_socket.close()
-
+            for server_socket in server_sockets:
+                server_socket.close()
 
+    def open_listener(self, port, timeout, reuse_port):
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            server_socket.settimeout(timeout)
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if reuse_port:
+                server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            server_socket.bind(('localhost', port))
+            server_socket.listen(LISTEN_BACKLOG)
+        except OSError:
+            server_socket.close()
+            raise
+        return server_socket
+
+    def accept_loop(self, server_socket, workers):
+        # A fixed pool of reusable workers instead of one new thread per connection.
+        # multi threading in python: GIL is a mechanism that allows one thread
+        # to execute python bytecode at a time in a single process.
+        backlog = PoolBacklog()
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix=f"{threading.current_thread().name}-Thread") as pool:
+            try:
+                while True:
+                    try:
+                        client_socket, client_address = server_socket.accept()
+                    except socket.timeout as e:
+                        log.error("Socket connection timed out: %s", e)
+                        return
+                    except OSError as e:
+                        log.warning("Error accepting connection: %s", e)
+                        continue
+                    try:
+                        # Push small responses out immediately and let bulk bodies fill the pipe
+                        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SEND_BUFFER_SIZE)
+                        server = HttpServer(client_socket, self.document_root, self.protocol, self.debug,
+                                            backlog=backlog)
+                    except OSError as e:
+                        # e.g. the peer reset the connection before we got to it
+                        log.warning("Error setting up connection: %s", e)
+                        client_socket.close()
+                        continue
+                    backlog.add(1)
+                    pool.submit(server.run)
+            finally:
+                # Stop the kernel routing new connections to this listener once nobody accepts on it
+                server_socket.close()
 
     def run(self):
+        if self.backlog is not None:
+            self.backlog.add(-1)
         try:
-            with self.connect, \
-                 self.connect.makefile('r', buffering=1) as in_file, \
-                 self.connect.makefile('wb', buffering=0) as out_file:
-
-                visited_url = in_file.readline()
-
-                request_parts = visited_url.split(' ')
-                if len(request_parts) < 2:
-                    print("Invalid request")
-                    self.bad_request(out_file, visited_url)
-                    return
-
-                http_method, file_name = request_parts[0], unquote(request_parts[1])
-
-                if self.debug:
-                    print("file_name", file_name)
-                if (http_method.upper() != "GET") or (not self.is_file_supported(file_name)):
-                    self.bad_request(out_file, http_method)
-                    return
-
-                file_path = self.get_file_path(file_name)
-                if file_path is None:
-                    self.file_not_found(out_file, file_name)
-                    return
-
-                if not os.access(file_path, os.R_OK):
-                    self.file_forbidden(out_file, file_name)
-                    return
-
+            with self.connect:
                 http_version = "HTTP/" + self.protocol
-                # Take HTTP version input once
-                
-                if self.debug:
-                    print("Current thread name is {} and file opened {}"\
-                          .format(threading.current_thread().name, file_path))
-                # Serve the file with the determined HTTP version
-                self.serve_file(out_file, file_path, http_version=http_version)
-
-                # Close the connection for HTTP/1.0 after a short delay
-                if http_version == "HTTP/1.0":
-                    time.sleep(2)
-                    print("Connection closed for HTTP/1.0")
+                # Idle keep-alive connections are dropped once this expires
+                self.connect.settimeout(self.timeout)
+                buf = bytearray()
 
+                while True:
+                    if not buf and not self.wait_idle(buf):
+                        # Idle too long (including a preconnect that never sends a request),
+                        # or the worker is needed for a queued connection
+                        break
+                    request = self.read_request(buf)
+                    if request is None:
+                        # Peer closed the connection or went idle
+                        break
+
+                    request_line, headers = request
+                    request_parts = request_line.split(b' ', 2)
+                    keep_alive = (len(request_parts) >= 2
+                                  and self.is_keep_alive(http_version, request_parts, headers))
+
+                    file_path, responsecode, file_stat = self.resolve_request(request_parts)
+                    # Serve the file with the determined HTTP version
+                    self.serve_file(file_path, responsecode, http_version, keep_alive, file_stat)
+
+                    if not keep_alive:
+                        log.debug("Connection closed for %s", http_version)
+                        break
+
+        except (socket.timeout, ConnectionError) as e:
+            # Routine client behaviour: stalled reads, resets and broken pipes
+            log.debug("Connection dropped: %r", e)
         except Exception as e:
-            print(f"Server error: {e}")
+            log.error("Server error: %s", e)
         finally:
             self.close_connection()
 
+    def resolve_request(self, request_parts):
+        if len(request_parts) < 2:
+            log.debug("Invalid request")
+            return self.bad_request(b' '.join(request_parts).decode('latin-1'))
+
+        http_method = request_parts[0].decode('latin-1')
+        file_name = unquote(request_parts[1].decode('latin-1'))
+
+        log.debug("file_name %s", file_name)
+        if (http_method.upper() != "GET") or (not self.is_file_supported(file_name)):
+            return self.bad_request(http_method)
+
+        resolved = self.get_file_path(file_name)
+        if resolved is None:
+            return self.file_not_found(file_name)
+        if resolved is FORBIDDEN_PATH or not self.is_readable(resolved[0]):
+            return self.file_forbidden(file_name)
+
+        file_path, file_stat = resolved
+        log.debug("Current thread name is %s and file opened %s",
+                  threading.current_thread().name, file_path)
+        return file_path, "200 OK", file_stat
+
+    def wait_idle(self, buf):
+        # Wait for the next request in short slices so the worker can be given up as soon as
+        # connections are queued behind it
+        deadline = time.monotonic() + self.timeout
+        self.connect.settimeout(IDLE_POLL)
+        try:
+            while True:
+                try:
+                    chunk = self.connect.recv(RECV_SIZE)
+                except socket.timeout:
+                    if time.monotonic() >= deadline or (self.backlog is not None and self.backlog.waiting):
+                        return False
+                    continue
+                if not chunk:
+                    return False
+                buf.extend(chunk)
+                return True
+        finally:
+            self.connect.settimeout(self.timeout)
+
+    def read_request(self, buf):
+        # Anything after the blank line is left in buf for the next pipelined request
+        end = buf.find(b"\r\n\r\n")
+        while end < 0:
+            if len(buf) > MAX_REQUEST_SIZE:
+                return None
+            try:
+                chunk = self.connect.recv(RECV_SIZE)
+            except socket.timeout:
+                return None
+            if not chunk:
+                return None
+            buf.extend(chunk)
+            end = buf.find(b"\r\n\r\n")
+
+        head = bytes(buf[:end])
+        del buf[:end + 4]
+        return self.parse_head(head)
+
+    @staticmethod
+    def parse_head(head):
+        lines = head.split(b"\r\n")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(b':')
+            headers[name.strip().lower()] = value.strip()
+        return lines[0], headers
+
+    def is_keep_alive(self, http_version, request_parts, headers):
+        if http_version != "HTTP/1.1":
+            return False
+        connection = headers.get(b'connection', b'').lower()
+        if len(request_parts) > 2 and request_parts[2].strip() == b"HTTP/1.0":
+            return connection == b'keep-alive'
+        return connection != b'close'
+
+    @staticmethod
+    def get_file_type(filepath):
+        # Same result as os.path.splitext on a URL path, without the generic separator handling
+        file_name = filepath.rpartition('/')[2].lstrip('.')
+        dot = file_name.rfind('.')
+        return file_name[dot:].lower() if dot >= 0 else ''
+
     def is_file_supported(self, filepath):
-        _, file_extension = os.path.splitext(filepath)
-        file_type = file_extension.lower()
-        supported_types = {'.pdf', '.jpeg', '.jpg', '.png', '.txt', '.gif', '.html', '.mp4', '.json', '', '.js', '.css'}
-        return file_type in supported_types
+        return self.get_file_type(filepath) in self.SUPPORTED_EXTS
 
     def get_file_path(self, file_name):
         if file_name == '/':
@@ -122,77 +340,215 @@ class HttpServer:
         else:
             file_name = file_name[1:]
 
-        file_path = os.path.normpath(os.path.join(self.document_root, file_name))
-
-        if os.path.exists(file_path):
-            return file_path
-        else:
+        try:
+            file_path = resolve_path(self._root_abs, file_name)
+        except ValueError:
+            # e.g. an embedded NUL byte, which no file name can contain
             return None
+        if file_path is None:
+            return FORBIDDEN_PATH
 
-    def serve_file(self, out_file, file_path, responsecode="200 OK", http_version="HTTP/1.1"):
+        # One stat answers existence, readability and size for the whole request
         try:
-            if responsecode != "200 OK":
-                error_file = open(file_path, 'rb')
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        # Directories, devices and pipes have no servable body
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+        return file_path, file_stat
+
+    def is_readable(self, file_path):
+        # Mode bits alone are not enough: the owner bits apply when we own the file, and ACLs
+        # can override both
+        return os.access(file_path, os.R_OK)
+
+    def serve_file(self, file_path, responsecode="200 OK", http_version="HTTP/1.1",
+                   keep_alive=False, file_stat=None):
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+        file_size = file_stat.st_size
+        headers = self.build_headers(file_path, file_size, responsecode, http_version, keep_alive)
+
+        # Opened only once the headers are ready, so nothing leaks if building them fails.
+        # Errors propagate to run, which logs them and closes the connection.
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+        try:
+            advise_sequential(fd)
+            if hasattr(os, "sendfile"):
+                # Zero-copy: let the kernel move the body straight from the page cache.
+                # Corking holds the headers back so they share a segment with the body.
+                self.set_cork(True)
+                try:
+                    self.send_buffers([headers])
+                    self.send_body(fd, file_size)
+                finally:
+                    # A peer that already reset can fail the uncork; keep the original error
+                    with suppress(OSError):
+                        self.set_cork(False)
             else:
-                error_file = open(file_path, 'rb')
-
-            content_type, _ = mimetypes.guess_type(file_path)
-
-            headers = [
-                "{} {}".format(http_version, responsecode),
-                "Server: Python HTTP Server",
-                "Date: {}".format(self.get_current_date()),
-                "Content-type: {}".format(content_type),
-                "Content-length: {}".format(os.path.getsize(file_path)),
-                "",
-                ""
-            ]
-            out_file.write("\r\n".join(headers).encode('utf-8'))
-
-            # Set timeout only for HTTP/1.0 requests
-            if http_version == "HTTP/1.0":
-                self.connect.settimeout(self.timeout)
-
-            chunk = error_file.read(4096)
-            while chunk:
-                out_file.write(chunk)
-                chunk = error_file.read(4096)
-        except Exception as e:
-            print(f"Error serving file: {e}")
+                body_file = open(fd, 'rb', buffering=0, closefd=False)
+                # Reuse one buffer rather than allocating a new bytes object per chunk
+                buf = bytearray(CHUNK_SIZE)
+                view = memoryview(buf)
+                n = body_file.readinto(buf)
+                # Headers and the first chunk go out in a single gathered write
+                self.send_buffers([headers, view[:n]])
+                n = body_file.readinto(buf)
+                while n:
+                    self.connect.sendall(view[:n])
+                    n = body_file.readinto(buf)
         finally:
-            error_file.close()
-
-    def bad_request(self, out_file, visited_url):
-        print(f"HTTP 400 Error: {visited_url} Bad Request!")
-        self.serve_file(out_file, self.BAD_REQUEST, "400 BadRequest")
-
-    def file_not_found(self, out_file, file_name):
-        print(f"HTTP 404 Error: {file_name} cannot be found!")
-        self.serve_file(out_file, self.FILE_NOT_FOUND, "404 FileNotFound")
-
-    def file_forbidden(self, out_file, file_name):
-        print(f"HTTP 403 Error: {file_name} Forbidden (No permission)")
-        self.serve_file(out_file, self.FORBIDDEN, "403 Forbidden")
-
-    def method_not_supported(self, out_file, http_method):
-        print(f"HTTP 501 Error: {http_method} HTTP method not implemented!")
-        self.serve_file(out_file, self.METHOD_NOT_SUPPORTED, "501 NotImplemented")
-
-    def get_current_date(self):
-        return datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
+            os.close(fd)
+
+    def build_headers(self, file_path, file_size, responsecode, http_version, keep_alive):
+        file_type = self.get_file_type(file_path)
+        template = HEADER_TEMPLATES.get(file_type) or build_header_template(file_type)
+        return (
+            STATUS_LINES[http_version, responsecode] + template
+            + b"Date: " + self.get_current_date()
+            + b"\r\nContent-length: " + str(file_size).encode('ascii')
+            + b"\r\n" + (KEEP_ALIVE_HEADER if keep_alive else CLOSE_HEADER)
+            + b"\r\n"
+        )
+
+    def send_buffers(self, buffers):
+        if not hasattr(self.connect, "sendmsg"):
+            self.connect.sendall(b"".join(buffers))
+            return
+        buffers = [memoryview(buffer) for buffer in buffers if len(buffer)]
+        while buffers:
+            sent = self.connect.sendmsg(buffers)
+            # Drop whatever the kernel accepted and retry the remainder
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            if buffers:
+                buffers[0] = buffers[0][sent:]
+
+    def set_cork(self, enabled):
+        if hasattr(socket, "TCP_CORK"):
+            self.connect.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, int(enabled))
+
+    def send_body(self, file_fd, file_size):
+        if not file_size:
+            return
+        # socket.sendfile waits for writability between os.sendfile calls and honours the
+        # connection timeout, so a client that stops reading cannot spin the worker
+        with open(file_fd, 'rb', buffering=0, closefd=False) as body_file:
+            self.connect.sendfile(body_file, 0, file_size)
+
+    def bad_request(self, visited_url):
+        log.info("HTTP 400 Error: %s Bad Request!", visited_url)
+        return self.BAD_REQUEST, "400 BadRequest", None
+
+    def file_not_found(self, file_name):
+        log.info("HTTP 404 Error: %s cannot be found!", file_name)
+        return self.FILE_NOT_FOUND, "404 FileNotFound", None
+
+    def file_forbidden(self, file_name):
+        log.info("HTTP 403 Error: %s Forbidden (No permission)", file_name)
+        return self.FORBIDDEN, "403 Forbidden", None
+
+    def method_not_supported(self, http_method):
+        log.info("HTTP 501 Error: %s HTTP method not implemented!", http_method)
+        return self.METHOD_NOT_SUPPORTED, "501 NotImplemented", None
+
+    @classmethod
+    def get_current_date(cls):
+        # HTTP dates only have second resolution, so format at most once a second
+        now = int(time.time())
+        with cls._date_lock:
+            if now != cls._date_cache[0]:
+                cls._date_cache = (now, time.strftime("%a, %d %b %Y %H:%M:%S GMT",
+                                                      time.gmtime(now)).encode('ascii'))
+            return cls._date_cache[1]
 
     def close_connection(self):
         try:
             if self.connect:
-                client_ip = self.connect.getpeername()[0]
                 self.connect.close()
-
-                if client_ip in self.connected_clients:
-                    self.connected_clients.remove(client_ip)
-                    print(f"Connection closed: {client_ip}")
+                log.debug("Connection closed")
         except OSError as e:
             if e.errno != 9:
-                print(f"Error closing connection: {e}")
+                log.warning("Error closing connection: %s", e)
+
+
+class AsyncHttpServer(HttpServer):
+    """Single-threaded asyncio variant of HttpServer sharing its request handling."""
+
+    def start(self, port, timeout = 500):
+        try:
+            asyncio.run(self.serve(port))
+        except Exception as e:
+            log.error("Server error: %s", e)
+
+    async def serve(self, port):
+        server = await asyncio.start_server(self.handle, 'localhost', port, reuse_address=True,
+                                            limit=MAX_REQUEST_SIZE, backlog=LISTEN_BACKLOG)
+        log.info("Server started. Listening for connections on port: %s", port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        log.debug("Connection opened: %s", writer.get_extra_info('peername')[0])
+        http_version = "HTTP/" + self.protocol
+        try:
+            while True:
+                try:
+                    # Idle keep-alive connections are dropped once the timeout expires
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+
+                request_line, headers = self.parse_head(head[:-4])
+                request_parts = request_line.split(b' ', 2)
+                keep_alive = (len(request_parts) >= 2
+                              and self.is_keep_alive(http_version, request_parts, headers))
+
+                file_path, responsecode, file_stat = self.resolve_request(request_parts)
+                await self.send_file(writer, file_path, responsecode, http_version, keep_alive,
+                                     file_stat)
+
+                if not keep_alive:
+                    log.debug("Connection closed for %s", http_version)
+                    break
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            # A client that stopped reading or went away; drop it without flushing
+            log.debug("Connection dropped: %r", e)
+            writer.transport.abort()
+        except Exception as e:
+            log.error("Server error: %s", e)
+            writer.transport.abort()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+            log.debug("Connection closed")
+
+    async def send_file(self, writer, file_path, responsecode, http_version, keep_alive, file_stat):
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+        file_size = file_stat.st_size
+        headers = self.build_headers(file_path, file_size, responsecode, http_version, keep_alive)
+
+        with open(file_path, 'rb') as body_file:
+            advise_sequential(body_file.fileno())
+            writer.write(headers)
+            # Every write must make progress within the timeout, so a client that stops
+            # reading cannot hold the connection open indefinitely
+            await asyncio.wait_for(writer.drain(), self.timeout)
+            # loop.sendfile uses os.sendfile where the transport supports it and falls back to
+            # chunked writes; sending in slices puts the timeout on progress, not on the whole body
+            loop = asyncio.get_running_loop()
+            offset = 0
+            while offset < file_size:
+                count = min(SENDFILE_SLICE, file_size - offset)
+                await asyncio.wait_for(loop.sendfile(writer.transport, body_file, offset, count),
+                                       self.timeout)
+                offset += count
 
 
 if __name__ == "__main__":
@@ -201,6 +557,8 @@ if __name__ == "__main__":
         parser.add_argument("-document_root", required=True, help="Path to the document root")
         parser.add_argument("-port", type=int, required=True, help="Port number")
         parser.add_argument("--protocol", type=str, default="1.1", required = False, help="Enter HTTP Version (default: 1.1)")
+        parser.add_argument("--mode", type=str, default="async", choices=["async", "thread"],
+                            required = False, help="Server model: asyncio event loop or thread pool (default: async)")
         parser.add_argument("--debug", type=bool, default=False, required = False, help="For multi threading debugging")
         args = parser.parse_args()
 
@@ -208,6 +566,8 @@ if __name__ == "__main__":
         port = args.port
         protocol = args.protocol
         debug = args.debug
+        logging.basicConfig(level=logging.DEBUG if debug else logging.INFO,
+                            format="%(asctime)s %(threadName)s %(levelname)s %(message)s")
         if not (8000 <= port <= 9999):
             raise ValueError("Port number must be between 8000 and 9999")
 
@@ -217,8 +577,9 @@ if __name__ == "__main__":
         if protocol not in {'1.1', '1.0'}:
             raise ValueError("Protocol should be either 1.1 or 1.0")
         
-        server = HttpServer(None, document_root, protocol, debug)
+        server_class = AsyncHttpServer if args.mode == "async" else HttpServer
+        server = server_class(None, document_root, protocol, debug)
         server.start(port)
 
     except Exception as e:
-        print(f"Error: {e}")
+        log.error("Error: %s", e)